@@ -4,10 +4,12 @@ PubMed scraper using Playwright.
 What it does:
 - Accepts one or more search terms/phrases
 - Converts them to PubMed "structured" format:  "term1"+"term2"+"term phrase"
+- Fetches results from the NCBI E-utilities JSON API by default (--engine eutils, via
+  pubmed_api; no browser launch); with --engine playwright or --save-html:
 - Opens PubMed home (tries local PubmedMain.html first; falls back to live site)
 - Runs the search
 - Saves:
-  - the resulting HTML page (similar to your PubmedAfterSearch.html snapshot)
+  - optionally (--save-html PATH) the resulting HTML page (similar to your PubmedAfterSearch.html snapshot)
   - structured JSON of results (PMID/title/citation/snippet/url)
 
 Requirements:
@@ -18,31 +20,189 @@ Requirements:
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
+import hashlib
+import http.client
 import json
 import re
 import shlex
+import sqlite3
 import sys
+import time
+import urllib.request
+import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional
 from urllib.parse import quote
 
+from playwright.async_api import async_playwright
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 from playwright.sync_api import sync_playwright
 
+from pubmed_api import PubMedSearchParams, pubmed_search
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional; without it saved HTML is scraped through page.evaluate
+    LexborHTMLParser = None
+
 
 WHITESPACE_RE = re.compile(r"\s+")
-YEAR_RE = re.compile(r"\b(18|19|20)\d{2}\b")
+# Year plus up to the next 2 tokens (month/season and optional day) of a PubMed citation.
+CITATION_DATE_RE = re.compile(r"\b((?:18|19|20)\d{2})\b(?:\s+[A-Za-z]{3,}(?:-[A-Za-z]{3,})?)?(?:\s+\d{1,2})?")
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DEFAULT_USER_DATA_DIR = Path.home() / ".cache" / "pubmed_scraper_profile"
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "pubmed_scraper_cache.sqlite3"
+DEFAULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+# Selectors show up in <2s on a healthy connection; fail fast instead of hanging for 30s.
+DEFAULT_NETWORK_TIMEOUT_MS = 8_000
+# Navigations (and the first results render after a wait_until="commit" goto) can need
+# longer on a cold DNS/TLS start.
+DEFAULT_GOTO_TIMEOUT_MS = 15_000
+
+# Sub-resources that never affect the scraped text; aborted before they hit the wire.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "stylesheet", "media"})
+BLOCKED_URL_PARTS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "ncbi.nlm.nih.gov/stat",
+    "cookielaw.org",  # OneTrust consent SDK
+    "onetrust.com",
+)
+
+# With wait_until="commit" nothing is parsed yet when goto returns: wait for these before probing.
+HOME_SEARCH_SEL = "form#search-form input[name='term']"
+ADV_LINK_SEL = "a.adv-search-link[href='/advanced/']"
+
+# Cookie consent + NCBI banners, matched in one query.
+POPUP_SEL = ", ".join(
+    [
+        "button#onetrust-accept-btn-handler",
+        "button[aria-label='Close Clipboard and Search History not available warning banner']",
+        "button.close-banner-button",
+        "button.ncbi-close-button",
+    ]
+)
+
+NEXT_PAGE_URL_JS = """
+() => {
+  const chunk = document.querySelector("div.search-results-chunk.results-chunk");
+  return (chunk && chunk.getAttribute("data-next-page-url")) || "";
+}
+"""
+
+# Runs inside the page and returns every raw string scrape_pubmed_results needs in a single
+# CDP round-trip. Cleanup stays in Python (_build_results_payload).
+EXTRACT_RESULTS_JS = """
+(maxResults) => {
+  const text = (root, sel) => {
+    const el = root.querySelector(sel);
+    return el ? el.innerText || "" : "";
+  };
+  const attr = (el, name) => (el && el.getAttribute(name)) || "";
+
+  const chunk = document.querySelector("div.search-results-chunk.results-chunk");
+  let articles = Array.from(document.querySelectorAll("article.full-docsum"));
+  if (maxResults !== null && maxResults !== undefined) {
+    articles = articles.slice(0, maxResults);
+  }
+
+  return {
+    meta: {
+      total_results: text(document, ".results-amount .value"),
+      pages_total: text(document, ".page-number-wrapper .of-total-pages"),
+      next_page_url: attr(chunk, "data-next-page-url"),
+      chunk_ids: attr(chunk, "data-chunk-ids"),
+      pages_amount: attr(chunk, "data-pages-amount"),
+    },
+    articles: articles.map((a) => {
+      const title = a.querySelector("a.docsum-title");
+      let journalFull = "";
+      let journalShort = "";
+      for (const el of a.querySelectorAll("span.docsum-journal-citation")) {
+        if (!journalFull && el.classList.contains("full-journal-citation")) journalFull = el.innerText || "";
+        else if (!journalShort && el.classList.contains("short-journal-citation")) journalShort = el.innerText || "";
+      }
+      return {
+        title: title ? title.innerText || "" : "",
+        href: attr(title, "href"),
+        article_id: attr(title, "data-article-id"),
+        pmid: text(a, "span.docsum-pmid"),
+        // Full authors precede short authors in the markup, so the first match prefers full.
+        authors: text(a, "span.docsum-authors.full-authors, span.docsum-authors.short-authors"),
+        journal_citation_full: journalFull,
+        journal_citation_short: journalShort,
+        snippet_full: text(a, ".docsum-snippet .full-view-snippet"),
+        snippet_short: text(a, ".docsum-snippet .short-view-snippet"),
+      };
+    }),
+  };
+}
+"""
 
 
 def _clean_text(s: str) -> str:
     return WHITESPACE_RE.sub(" ", (s or "").strip())
 
 
+@functools.lru_cache(maxsize=8)
+def _resolved_local_home(explicit: Optional[str]) -> tuple[Path, str]:
+    """(path, file:// URL or "" if missing) of the local PubMed home page; resolved once per process."""
+    path = Path(explicit).expanduser().resolve() if explicit else (SCRIPT_DIR / "PubmedMain.html")
+    return path, (path.as_uri() if path.exists() else "")
+
+
+def _dumps_json(data: Any, *, indent: bool = True) -> bytes:
+    """UTF-8 JSON (indented by default), via orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def _loads_json(raw: bytes) -> Any:
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _is_blocked_request(request) -> bool:
+    return request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS)
+
+
+def _write_html(path: Path, html: str) -> None:
+    # Encode once and hand the bytes to a large binary buffer (no TextIOWrapper in between).
+    with path.open("wb", buffering=1 << 20) as f:
+        f.write(html.encode("utf-8"))
+
+
+def _block_heavy_resources(route) -> None:
+    if _is_blocked_request(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+
+async def _block_heavy_resources_async(route) -> None:
+    if _is_blocked_request(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 def build_pubmed_structured_query(terms: list[str]) -> str:
-    cleaned = [t.strip() for t in terms if t and t.strip()]
-    if not cleaned:
+    # One strip per term; empty/blank terms are skipped.
+    query = "+".join(f'"{s}"' for s in (t.strip() for t in terms if t) if s)
+    if not query:
         raise ValueError("No terms provided. Provide at least one word or phrase.")
-    return "+".join(f"\"{t}\"" for t in cleaned)
+    return query
 
 
 def parse_terms_from_cli(args: argparse.Namespace) -> list[str]:
@@ -62,24 +222,6 @@ def parse_terms_from_cli(args: argparse.Namespace) -> list[str]:
     raise ValueError("Provide search terms via --terms or --query.")
 
 
-def safe_inner_text(locator) -> str:
-    try:
-        if locator.count() == 0:
-            return ""
-        return locator.first.inner_text()
-    except Exception:
-        return ""
-
-
-def safe_attr(locator, name: str) -> str:
-    try:
-        if locator.count() == 0:
-            return ""
-        return locator.first.get_attribute(name) or ""
-    except Exception:
-        return ""
-
-
 def to_full_pubmed_url(href: str) -> str:
     href = (href or "").strip()
     if not href:
@@ -116,100 +258,124 @@ def build_date_publication_clause(
     return f"(\"{start}\"[Date - Publication] : \"{end}\"[Date - Publication])"
 
 
-def parse_publication_year(citation_text: str) -> Optional[int]:
-    m = YEAR_RE.search(citation_text or "")
-    if not m:
-        return None
-    try:
-        return int(m.group(0))
-    except ValueError:
-        return None
+def build_pubmed_results_url(
+    structured_query: str,
+    pub_date_start: Optional[str] = None,
+    pub_date_end: Optional[str] = None,
+    page_number: int = 1,
+) -> str:
+    """Direct results-page URL, with the publication date range embedded in the term."""
+    date_clause = build_date_publication_clause(pub_date_start, pub_date_end)
+    combined = f"({date_clause}) AND ({structured_query})" if date_clause else structured_query
+    url = build_pubmed_search_url(combined)
+    return f"{url}&page={page_number}" if page_number > 1 else url
 
 
-def parse_publication_date_text(citation_text: str) -> str:
+def parse_citation_date(citation_text: str) -> tuple[Optional[int], str]:
     """
-    Best-effort extraction of the date-ish part from PubMed's citation string.
+    Best-effort extraction of (year, date-ish text) from PubMed's citation string in one pass.
     Examples:
-      "Brain Imaging Behav. 2012 Dec;6(4):..." -> "2012 Dec"
-      "JAMA Netw Open. 2025 Jun 2;8(6):..."   -> "2025 Jun 2"
-      "Alzheimer Dis Assoc Disord. 2024 Jul-Sep 01;..." -> "2024 Jul-Sep 01"
+      "Brain Imaging Behav. 2012 Dec;6(4):..." -> (2012, "2012 Dec")
+      "JAMA Netw Open. 2025 Jun 2;8(6):..."   -> (2025, "2025 Jun 2")
+      "Alzheimer Dis Assoc Disord. 2024 Jul-Sep 01;..." -> (2024, "2024 Jul-Sep 01")
     """
-    s = citation_text or ""
-    # Grab year plus up to the next 2 tokens (month/season and optional day).
-    m = re.search(r"\b((?:18|19|20)\d{2})(?:\s+([A-Za-z]{3,}(?:-[A-Za-z]{3,})?))?(?:\s+(\d{1,2}))?", s)
+    m = CITATION_DATE_RE.search(citation_text or "")
     if not m:
-        return ""
-    year, token1, token2 = m.group(1), m.group(2), m.group(3)
-    parts = [year]
-    if token1:
-        parts.append(token1)
-    if token2:
-        parts.append(token2)
-    return " ".join(parts)
+        return None, ""
+    # Citations are whitespace-normalized already, so the matched span is the date text.
+    return int(m.group(1)), m.group(0)
 
 
-def scrape_pubmed_results(page, max_results: Optional[int] = None) -> dict[str, Any]:
-    # Metadata
-    total_results_text = _clean_text(safe_inner_text(page.locator(".results-amount .value")))
-    total_results = int(total_results_text) if total_results_text.isdigit() else None
+def parse_publication_year(citation_text: str) -> Optional[int]:
+    return parse_citation_date(citation_text)[0]
 
-    pages_total_text = _clean_text(safe_inner_text(page.locator(".page-number-wrapper .of-total-pages")))
+
+def parse_publication_date_text(citation_text: str) -> str:
+    return parse_citation_date(citation_text)[1]
+
+
+def fetch_pubmed_eutils(
+    terms: list[str],
+    retmax: int = 10,
+    mindate: Optional[str] = None,
+    maxdate: Optional[str] = None,
+    *,
+    api_key: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    Fetch search results via NCBI E-utilities (ESearch + ESummary) instead of driving a browser.
+    Thin wrapper over pubmed_api.pubmed_search (pooled HTTP/2 client, in-process cache).
+    Returns the same shape as scrape_pubmed_results (snippets are not available from ESummary).
+    An NCBI api_key raises the rate limit from 3 to 10 requests/second.
+    """
+    if mindate or maxdate:
+        # ESearch needs both ends of the range; use the same wide defaults as the term clause.
+        mindate = (mindate or "").strip() or "1800/01/01"
+        maxdate = (maxdate or "").strip() or "3000/12/31"
+    return pubmed_search(
+        PubMedSearchParams(
+            terms=terms,
+            max_results=max(0, int(retmax)),
+            pub_date_start=mindate,
+            pub_date_end=maxdate,
+            api_key=api_key,
+        )
+    )
+
+
+def _parse_count(text: str) -> Optional[int]:
+    # PubMed renders large counts with thousands separators ("12,345").
+    digits = _clean_text(text).replace(",", "")
+    return int(digits) if digits.isdigit() else None
+
+
+def _clean_batch(values: list[str]) -> list[str]:
+    # Same result as _clean_text on each value, but one regex pass over the whole page's text.
+    # NUL can't occur in DOM text (parsers replace it), so it is a safe field separator.
+    return [v.strip() for v in WHITESPACE_RE.sub(" ", "\0".join(values)).split("\0")]
+
+
+def _build_results_payload(raw: dict[str, Any]) -> dict[str, Any]:
+    """
+    Turn the raw strings pulled out of a results page ({"meta": {...}, "articles": [...]})
+    into the structured JSON dict. All cleanup/regex work happens here, in Python.
+    """
+    meta = raw.get("meta") or {}
+
+    total_results = _parse_count(meta.get("total_results", ""))
+
+    pages_total_text = _clean_text(meta.get("pages_total", ""))
     pages_total = None
     if pages_total_text.lower().startswith("of "):
-        maybe = pages_total_text[3:].strip()
-        pages_total = int(maybe) if maybe.isdigit() else None
-
-    chunk = page.locator("div.search-results-chunk.results-chunk").first
-    next_page_url = safe_attr(chunk, "data-next-page-url")
-    chunk_ids = safe_attr(chunk, "data-chunk-ids")
-    pages_total_from_chunk = safe_attr(chunk, "data-pages-amount")
-    if pages_total is None and pages_total_from_chunk.isdigit():
-        pages_total = int(pages_total_from_chunk)
-
-    # Results
-    articles_loc = page.locator("article.full-docsum")
-    n = articles_loc.count()
-    if max_results is not None:
-        n = min(n, max_results)
+        pages_total = _parse_count(pages_total_text[3:])
+
+    next_page_url = meta.get("next_page_url", "")
+    chunk_ids = meta.get("chunk_ids", "")
+    if pages_total is None:
+        pages_total = _parse_count(meta.get("pages_amount", ""))
+
+    articles = raw.get("articles") or []
+    cleaned = _clean_batch(
+        [
+            (art.get(key) or "")
+            for art in articles
+            for key in ("title", "pmid", "authors", "journal_citation_full", "journal_citation_short")
+        ]
+        + [(art.get("snippet_full") or art.get("snippet_short") or "") for art in articles]
+    )
+    snippets = cleaned[5 * len(articles) :]
 
     results: list[dict[str, Any]] = []
-    for i in range(n):
-        art = articles_loc.nth(i)
-
-        title_loc = art.locator("a.docsum-title")
-        title = _clean_text(safe_inner_text(title_loc))
-        href = safe_attr(title_loc, "href")
-        url = to_full_pubmed_url(href)
-        article_id = safe_attr(title_loc, "data-article-id")
-
-        pmid = _clean_text(safe_inner_text(art.locator("span.docsum-pmid"))) or article_id
-
-        authors_full = _clean_text(safe_inner_text(art.locator("span.docsum-authors.full-authors")))
-        authors_short = _clean_text(safe_inner_text(art.locator("span.docsum-authors.short-authors")))
-        # Only output one field: prefer full authors, fallback to short if full isn't present.
-        authors = authors_full or authors_short
-        journal_citation_full = _clean_text(
-            safe_inner_text(art.locator("span.docsum-journal-citation.full-journal-citation"))
-        )
-        journal_citation_short = _clean_text(
-            safe_inner_text(art.locator("span.docsum-journal-citation.short-journal-citation"))
-        )
+    for i, art in enumerate(articles):
+        # Only one authors field is scraped: full authors, or short authors if full isn't present.
+        title, pmid, authors, journal_citation_full, journal_citation_short = cleaned[5 * i : 5 * i + 5]
+        url = to_full_pubmed_url(art.get("href", ""))
+        pmid = pmid or art.get("article_id", "")
         journal_citation = journal_citation_full or journal_citation_short
 
-        publication_year = (
-            parse_publication_year(journal_citation_short)
-            or parse_publication_year(journal_citation_full)
-            or parse_publication_year(journal_citation)
-        )
-        publication_date_text = (
-            parse_publication_date_text(journal_citation_full)
-            or parse_publication_date_text(journal_citation_short)
-        )
+        publication_year, publication_date_text = parse_citation_date(journal_citation)
 
-        snippet = _clean_text(
-            safe_inner_text(art.locator(".docsum-snippet .full-view-snippet"))
-            or safe_inner_text(art.locator(".docsum-snippet .short-view-snippet"))
-        )
+        snippet = snippets[i]
 
         results.append(
             {
@@ -235,224 +401,666 @@ def scrape_pubmed_results(page, max_results: Optional[int] = None) -> dict[str,
     }
 
 
-def run_pubmed_scrape(
-    *,
-    terms: list[str],
-    headless: bool = True,
-    slowmo: int = 0,
-    step_delay: int = 0,
-    max_results: int = 10,
-    save_html: Optional[str] = "PubmedAfterSearch_generated.html",
-    output_json: Optional[str] = "pubmed_results.json",
-    source: str = "live",
-    local_home: Optional[str] = None,
-    pub_date_start: Optional[str] = None,
-    pub_date_end: Optional[str] = None,
-    debug_html_on_error: Optional[str] = "pubmed_debug_last.html",
-    user_data_dir: Optional[str] = None,
-    user_agent: Optional[str] = None,
-    locale: str = "en-US",
-    timezone_id: str = "America/New_York",
-    chromium_channel: Optional[str] = None,
-) -> dict[str, Any]:
+def scrape_pubmed_results(page, max_results: Optional[int] = None) -> dict[str, Any]:
+    # One page.evaluate for metadata + all articles instead of ~10 locator round-trips per article.
+    raw = page.evaluate(EXTRACT_RESULTS_JS, max_results)
+    return _build_results_payload(raw)
+
+
+def _node_text(root, sel: str) -> str:
+    node = root.css_first(sel)
+    return node.text() if node is not None else ""
+
+
+def _node_attr(node, name: str) -> str:
+    return (node.attributes.get(name) or "") if node is not None else ""
+
+
+def scrape_pubmed_from_html(html: str, max_results: Optional[int] = None) -> dict[str, Any]:
     """
-    Programmatic API for this scraper (used by the chat agent).
-    Returns the structured JSON dict. Optionally writes HTML/JSON to disk.
+    Same output as scrape_pubmed_results, but parsed from an HTML string (selectolax/lexbor)
+    instead of querying the live page. Requires `pip install selectolax`.
     """
-    structured_query = build_pubmed_structured_query(terms)
+    if LexborHTMLParser is None:
+        raise RuntimeError("selectolax is not installed (pip install selectolax).")
+    tree = LexborHTMLParser(html)
+
+    chunk = tree.css_first("div.search-results-chunk.results-chunk")
+    articles = tree.css("article.full-docsum")
+    if max_results is not None:
+        articles = articles[:max_results]
+
+    raw_articles = []
+    for art in articles:
+        title = art.css_first("a.docsum-title")
+        journal_full = journal_short = ""
+        for node in art.css("span.docsum-journal-citation"):
+            classes = _node_attr(node, "class").split()
+            if not journal_full and "full-journal-citation" in classes:
+                journal_full = node.text()
+            elif not journal_short and "short-journal-citation" in classes:
+                journal_short = node.text()
+        raw_articles.append(
+            {
+                "title": title.text() if title is not None else "",
+                "href": _node_attr(title, "href"),
+                "article_id": _node_attr(title, "data-article-id"),
+                "pmid": _node_text(art, "span.docsum-pmid"),
+                "authors": _node_text(art, "span.docsum-authors.full-authors, span.docsum-authors.short-authors"),
+                "journal_citation_full": journal_full,
+                "journal_citation_short": journal_short,
+                "snippet_full": _node_text(art, ".docsum-snippet .full-view-snippet"),
+                "snippet_short": _node_text(art, ".docsum-snippet .short-view-snippet"),
+            }
+        )
 
-    script_dir = Path(__file__).resolve().parent
-    local_home_path = Path(local_home).expanduser().resolve() if local_home else (script_dir / "PubmedMain.html")
-    local_home_url = local_home_path.as_uri() if local_home_path.exists() else ""
+    return _build_results_payload(
+        {
+            "meta": {
+                "total_results": _node_text(tree, ".results-amount .value"),
+                "pages_total": _node_text(tree, ".page-number-wrapper .of-total-pages"),
+                "next_page_url": _node_attr(chunk, "data-next-page-url"),
+                "chunk_ids": _node_attr(chunk, "data-chunk-ids"),
+                "pages_amount": _node_attr(chunk, "data-pages-amount"),
+            },
+            "articles": raw_articles,
+        }
+    )
 
-    save_html_path = Path(save_html).expanduser() if save_html else None
-    out_json_path = Path(output_json).expanduser() if output_json else None
 
-    with sync_playwright() as p:
-        step_delay_ms = 0 if headless else max(0, int(step_delay))
-        launch_args = [
-            "--disable-blink-features=AutomationControlled",
-            "--disable-features=IsolateOrigins,site-per-process",
-        ]
+def _merge_result_pages(pages: list[dict[str, Any]]) -> dict[str, Any]:
+    """Combine consecutive results pages of one query (metadata from the first page)."""
+    data = dict(pages[0])
+    data["next_page_url"] = pages[-1]["next_page_url"]
+    data["chunk_ids"] = [cid for payload in pages for cid in payload["chunk_ids"]]
+    data["results"] = [r for payload in pages for r in payload["results"]]
+    return data
 
-        if user_data_dir:
-            context = p.chromium.launch_persistent_context(
-                user_data_dir=str(user_data_dir),
-                headless=headless,
-                slow_mo=max(0, int(slowmo)),
-                channel=chromium_channel,
-                args=launch_args,
-                locale=locale,
-                timezone_id=timezone_id,
-                user_agent=user_agent,
-            )
-            page = context.new_page()
-            browser = None
-        else:
-            browser = p.chromium.launch(
-                headless=headless,
-                slow_mo=max(0, int(slowmo)),
-                channel=chromium_channel,
-                args=launch_args,
-            )
-            context = browser.new_context(
-                locale=locale,
-                timezone_id=timezone_id,
-                user_agent=user_agent,
-            )
-            page = context.new_page()
-
-        def _dismiss_common_popups() -> None:
-            for sel in [
-                "button#onetrust-accept-btn-handler",
-                "button[aria-label='Close Clipboard and Search History not available warning banner']",
-                "button.close-banner-button",
-                "button.ncbi-close-button",
-            ]:
-                try:
-                    loc = page.locator(sel)
-                    if loc.count() > 0:
-                        loc.first.click(timeout=1000)
-                except Exception:
-                    pass
 
-        def _run_advanced_search_with_publication_date() -> None:
-            try:
-                adv_link = page.locator("a.adv-search-link[href='/advanced/']").first
-                if adv_link.count() > 0:
-                    adv_link.click(timeout=3000)
-                else:
-                    raise RuntimeError("advanced link not found")
-            except Exception:
-                page.goto("https://pubmed.ncbi.nlm.nih.gov/advanced/", wait_until="domcontentloaded", timeout=30_000)
-
-            _dismiss_common_popups()
-            # Sometimes the container exists but isn't considered "visible" (overlay/layout); attached is enough.
-            page.wait_for_selector("#advanced-search-page-container", state="attached", timeout=60_000)
-
-            page.wait_for_selector("select#field-selector", timeout=30_000)
-            try:
-                page.select_option("#field-selector", label="Date - Publication")
-            except Exception:
-                page.select_option("#field-selector", value="Date - Publication")
-            if step_delay_ms:
-                page.wait_for_timeout(step_delay_ms)
-
-            if pub_date_start:
-                page.locator("#start-date-input").fill(pub_date_start)
-                if step_delay_ms:
-                    page.wait_for_timeout(step_delay_ms)
-            if pub_date_end:
-                page.locator("#end-date-input").fill(pub_date_end)
-                if step_delay_ms:
-                    page.wait_for_timeout(step_delay_ms)
-
-            page.locator("button.add-button").click()
-            page.wait_for_timeout(300 if headless else max(300, step_delay_ms))
-
-            query_box = page.locator("textarea#query-box-input[name='term']").first
-            query_box.wait_for(state="attached", timeout=30_000)
-            existing_query = (query_box.input_value() or "").strip()
-            if existing_query:
-                combined_query = f"({existing_query}) AND ({structured_query})"
-            else:
-                combined_query = structured_query
-            query_box.fill(combined_query)
-            if step_delay_ms:
-                page.wait_for_timeout(step_delay_ms)
-
-            page.locator("button.search-btn[data-ga-action='search_button']").click()
-            if step_delay_ms:
-                page.wait_for_timeout(step_delay_ms)
-
-        opened = False
-        if source == "live":
-            page.goto("https://pubmed.ncbi.nlm.nih.gov/", wait_until="domcontentloaded", timeout=30_000)
-            _dismiss_common_popups()
-            opened = True
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pubmed-prefetch")
 
-        if not opened and source == "local":
-            if not local_home_url:
-                raise FileNotFoundError(f"Local home not found at: {local_home_path}")
-            page.goto(local_home_url, wait_until="domcontentloaded", timeout=12_000)
-            page.wait_for_selector("form#search-form input#id_term[name='term']", state="attached", timeout=8_000)
-            opened = True
 
-        if not opened and source == "auto":
-            if local_home_url:
-                try:
-                    page.goto(local_home_url, wait_until="domcontentloaded", timeout=12_000)
-                    page.wait_for_selector("form#search-form input#id_term[name='term']", state="attached", timeout=8_000)
-                    opened = True
-                except PlaywrightTimeoutError:
-                    opened = False
-
-            if not opened:
-                page.goto("https://pubmed.ncbi.nlm.nih.gov/", wait_until="domcontentloaded", timeout=30_000)
-                _dismiss_common_popups()
-                opened = True
+def _fetch_html(url: str, *, user_agent: Optional[str] = None, timeout_s: int = 30) -> str:
+    req = urllib.request.Request(
+        url,
+        headers={
+            "User-Agent": user_agent or "Mozilla/5.0 (compatible; ResearchAgent-Scrapp/1.0)",
+            "Accept": "text/html",
+        },
+        method="GET",
+    )
+    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
+        return resp.read().decode("utf-8", errors="replace")
+
+
+def _dismiss_common_popups(page) -> None:
+    try:
+        buttons = page.locator(POPUP_SEL).all()
+    except Exception:
+        return
+    for btn in buttons:
+        try:
+            # Closing a banner never navigates; don't wait for one.
+            btn.click(timeout=500, no_wait_after=True)
+        except Exception:
+            pass
 
-        performed_search = False
-        if pub_date_start or pub_date_end:
-            # Advanced Search UI can be flaky in headless due to slow loads / bot mitigation.
-            # Try it first; if it fails, fall back to a direct URL with an embedded date clause.
+
+def _open_live_home(page) -> None:
+    page.goto("https://pubmed.ncbi.nlm.nih.gov/", wait_until="commit")
+    page.wait_for_selector(HOME_SEARCH_SEL, state="attached")
+    _dismiss_common_popups(page)
+
+
+def _run_advanced_search_with_publication_date(
+    page,
+    *,
+    structured_query: str,
+    pub_date_start: Optional[str],
+    pub_date_end: Optional[str],
+) -> None:
+    try:
+        adv_link = page.locator(ADV_LINK_SEL).first
+        adv_link.wait_for(state="attached", timeout=3000)
+        adv_link.click(timeout=3000)
+    except Exception:
+        page.goto("https://pubmed.ncbi.nlm.nih.gov/advanced/", wait_until="commit")
+
+    # Sometimes the container exists but isn't considered "visible" (overlay/layout); attached is enough.
+    page.wait_for_selector("#advanced-search-page-container", state="attached")
+    _dismiss_common_popups(page)
+
+    page.wait_for_selector("select#field-selector")
+    try:
+        page.select_option("#field-selector", label="Date - Publication")
+    except Exception:
+        page.select_option("#field-selector", value="Date - Publication")
+
+    # Selecting the date field swaps in the range inputs; wait for them rather than sleeping.
+    if pub_date_start:
+        page.wait_for_selector("#start-date-input", timeout=5_000)
+        page.locator("#start-date-input").fill(pub_date_start)
+    if pub_date_end:
+        page.wait_for_selector("#end-date-input", timeout=5_000)
+        page.locator("#end-date-input").fill(pub_date_end)
+
+    page.locator("button.add-button").click()
+    # The query box is part of the static markup, so waiting for it proves nothing: wait until ADD
+    # has written the date clause into it. A timeout raises, and the caller falls back to a results
+    # URL with the date clause embedded rather than searching without the filter.
+    page.wait_for_function(
+        "() => (document.querySelector('#query-box-input')?.value || '').trim() !== ''", timeout=5_000
+    )
+
+    query_box = page.locator("textarea#query-box-input[name='term']").first
+    existing_query = (query_box.input_value() or "").strip()
+    if existing_query:
+        combined_query = f"({existing_query}) AND ({structured_query})"
+    else:
+        combined_query = structured_query
+    query_box.fill(combined_query)
+
+    page.locator("button.search-btn[data-ga-action='search_button']").click()
+
+
+def _open_and_search_via_ui(
+    page,
+    *,
+    structured_query: str,
+    source: str,
+    local_home: Optional[str],
+    pub_date_start: Optional[str],
+    pub_date_end: Optional[str],
+) -> None:
+    """
+    Open PubMed (live homepage or local PubmedMain.html) and run the search through the UI:
+    the Advanced Search builder when a date range is given, else the search box.
+    Falls back to direct results-URL navigation if the UI steps fail.
+    """
+    local_home_path, local_home_url = _resolved_local_home(local_home)
+
+    opened = False
+    if source == "live":
+        _open_live_home(page)
+        opened = True
+
+    if not opened and source == "local":
+        if not local_home_url:
+            raise FileNotFoundError(f"Local home not found at: {local_home_path}")
+        page.goto(local_home_url, wait_until="commit", timeout=12_000)
+        page.wait_for_selector("form#search-form input#id_term[name='term']", state="attached", timeout=8_000)
+        opened = True
+
+    if not opened and source == "auto":
+        if local_home_url:
             try:
-                _run_advanced_search_with_publication_date()
-                performed_search = True
-            except Exception:
-                date_clause = build_date_publication_clause(pub_date_start, pub_date_end)
-                combined = f"({date_clause}) AND ({structured_query})" if date_clause else structured_query
-                results_url = build_pubmed_search_url(combined)
-                page.goto(results_url, wait_until="domcontentloaded", timeout=60_000)
-                performed_search = True
-
-        if not performed_search:
+                page.goto(local_home_url, wait_until="commit", timeout=12_000)
+                page.wait_for_selector("form#search-form input#id_term[name='term']", state="attached", timeout=8_000)
+                opened = True
+            except PlaywrightTimeoutError:
+                opened = False
+
+        if not opened:
+            _open_live_home(page)
+            opened = True
+
+    performed_search = False
+    if pub_date_start or pub_date_end:
+        # Advanced Search UI can be flaky in headless due to slow loads / bot mitigation.
+        # Try it first; if it fails, fall back to a direct URL with an embedded date clause.
+        try:
+            _run_advanced_search_with_publication_date(
+                page,
+                structured_query=structured_query,
+                pub_date_start=pub_date_start,
+                pub_date_end=pub_date_end,
+            )
+            performed_search = True
+        except Exception:
+            results_url = build_pubmed_results_url(structured_query, pub_date_start, pub_date_end)
+            page.goto(results_url, wait_until="commit")
+            performed_search = True
+
+    if not performed_search:
+        did_ui_search = False
+        try:
+            search_input = page.locator(HOME_SEARCH_SEL).first
+            search_input.wait_for(state="attached", timeout=8_000)
+            _dismiss_common_popups(page)
+            search_input.click(timeout=2_000)
+            search_input.fill(structured_query, timeout=5_000)
+            search_input.press("Enter", timeout=5_000)
+            did_ui_search = True
+        except Exception:
             did_ui_search = False
-            try:
-                search_input = page.locator("form#search-form input[name='term']").first
-                search_input.wait_for(state="attached", timeout=8_000)
-                _dismiss_common_popups()
-                search_input.click(timeout=2_000)
-                search_input.fill(structured_query, timeout=5_000)
-                search_input.press("Enter", timeout=5_000)
-                did_ui_search = True
-            except Exception:
-                did_ui_search = False
-
-            if not did_ui_search:
+
+        if not did_ui_search:
+            results_url = build_pubmed_search_url(structured_query)
+            page.goto(results_url, wait_until="commit")
+
+
+class ResultCache:
+    """
+    On-disk (SQLite, WAL mode) memo of scrape results keyed by engine + query + date range + max results.
+
+        with ResultCache(DEFAULT_CACHE_PATH) as cache:
+            data = cache.get(key, ttl_seconds=3600)
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, ts INTEGER NOT NULL, payload BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        structured_query: str,
+        pub_date_start: Optional[str],
+        pub_date_end: Optional[str],
+        max_results: int,
+        engine: str,
+    ) -> str:
+        # The engines return differently shaped payloads (snippets, next_page_url), so they never share entries.
+        raw = f"{engine}|{structured_query}|{pub_date_start or ''}|{pub_date_end or ''}|{max_results}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl_seconds: int) -> Optional[dict[str, Any]]:
+        row = self._conn.execute("SELECT ts, payload FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[0] >= ttl_seconds:
+            return None
+        return _loads_json(row[1])
+
+    def put(self, key: str, data: dict[str, Any]) -> None:
+        self._conn.execute(
+            "INSERT INTO results (key, ts, payload) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET ts = excluded.ts, payload = excluded.payload",
+            (key, int(time.time()), _dumps_json(data, indent=False)),
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class PubMedScraper:
+    """
+    Keeps one persistent Chromium context (and page) alive across searches.
+    Cookies (incl. the accepted OneTrust consent), local storage and the HTTP cache live in
+    user_data_dir, so repeat runs skip the cold start and the consent banners stay dismissed.
+
+        with PubMedScraper(headless=True) as scraper:
+            data = scraper.scrape(terms=["older", "alzheimer"])
+    """
+
+    def __init__(
+        self,
+        *,
+        headless: bool = True,
+        slowmo: int = 0,
+        user_data_dir: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        locale: str = "en-US",
+        timezone_id: str = "America/New_York",
+        chromium_channel: Optional[str] = None,
+        network_timeout_ms: int = DEFAULT_NETWORK_TIMEOUT_MS,
+        goto_timeout_ms: int = DEFAULT_GOTO_TIMEOUT_MS,
+        full_render: bool = False,
+    ) -> None:
+        self.headless = headless
+        self.slowmo = max(0, int(slowmo))
+        self.user_data_dir = Path(user_data_dir).expanduser() if user_data_dir else DEFAULT_USER_DATA_DIR
+        self.user_agent = user_agent
+        self.locale = locale
+        self.timezone_id = timezone_id
+        self.chromium_channel = chromium_channel
+        self.network_timeout_ms = int(network_timeout_ms)
+        self.goto_timeout_ms = int(goto_timeout_ms)
+        self.full_render = full_render
+        self._playwright = None
+        self.context = None
+        self.page = None
+
+    def __enter__(self) -> "PubMedScraper":
+        self.user_data_dir.mkdir(parents=True, exist_ok=True)
+        self._playwright = sync_playwright().start()
+        try:
+            self.context = self._playwright.chromium.launch_persistent_context(
+                user_data_dir=str(self.user_data_dir),
+                headless=self.headless,
+                slow_mo=self.slowmo,
+                channel=self.chromium_channel,
+                args=[
+                    "--disable-blink-features=AutomationControlled",
+                    "--disable-features=IsolateOrigins,site-per-process",
+                ],
+                locale=self.locale,
+                timezone_id=self.timezone_id,
+                user_agent=self.user_agent,
+                # A service worker would fetch (and cache) sub-resources behind the route handler.
+                service_workers="allow" if self.full_render else "block",
+            )
+        except Exception:
+            self._playwright.stop()
+            self._playwright = None
+            raise
+        # A persistent context starts with one blank tab; reuse it instead of opening another.
+        if not self.full_render:
+            # Context-wide, so popups/new tabs are covered too.
+            self.context.route("**/*", _block_heavy_resources)
+        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        # Every wait/action without an explicit timeout inherits these.
+        self.page.set_default_timeout(self.network_timeout_ms)
+        self.page.set_default_navigation_timeout(self.goto_timeout_ms)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self.context is not None:
+                self.context.close()
+        finally:
+            if self._playwright is not None:
+                self._playwright.stop()
+            self._playwright = None
+            self.context = None
+            self.page = None
+
+    def scrape(
+        self,
+        *,
+        terms: list[str],
+        max_results: int = 10,
+        save_html: Optional[str] = None,
+        output_json: Optional[str] = None,
+        source: str = "live",
+        local_home: Optional[str] = None,
+        pub_date_start: Optional[str] = None,
+        pub_date_end: Optional[str] = None,
+        debug_html_on_error: Optional[str] = "pubmed_debug_last.html",
+        include_next_page: bool = False,
+        ui_interaction: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Run one search in the already-open page and return the structured JSON dict.
+        Optionally writes HTML/JSON to disk.
+        With source="live" the results URL is opened directly; ui_interaction (or a local/auto
+        source) drives the homepage search box / Advanced Search builder instead.
+        With include_next_page, the second results page is downloaded in the background while
+        the first is scraped, then parsed with selectolax and appended (max_results per page);
+        if that download fails, only the first page is returned.
+        """
+        if self.page is None:
+            raise RuntimeError("PubMedScraper must be used as a context manager.")
+        if include_next_page and LexborHTMLParser is None:
+            raise RuntimeError("include_next_page needs selectolax (pip install selectolax).")
+        page = self.page
+        structured_query = build_pubmed_structured_query(terms)
+
+        save_html_path = Path(save_html).expanduser() if save_html else None
+        out_json_path = Path(output_json).expanduser() if output_json else None
+
+        if ui_interaction or source != "live":
+            _open_and_search_via_ui(
+                page,
+                structured_query=structured_query,
+                source=source,
+                local_home=local_home,
+                pub_date_start=pub_date_start,
+                pub_date_end=pub_date_end,
+            )
+        else:
+            # The results URL carries the same query (and date clause) the UI would submit,
+            # so skip the homepage load and the typing/clicking round-trips.
+            if pub_date_start or pub_date_end:
+                results_url = build_pubmed_results_url(structured_query, pub_date_start, pub_date_end)
+            else:
                 results_url = build_pubmed_search_url(structured_query)
-                page.goto(results_url, wait_until="domcontentloaded", timeout=30_000)
+            page.goto(results_url, wait_until="commit")
 
         try:
             # PubMed can render elements in ways Playwright considers not "visible" yet.
-            # Attached is sufficient for scraping DOM text/attrs.
-            page.wait_for_selector("#search-results", state="attached", timeout=60_000)
-            page.wait_for_selector("article.full-docsum", state="attached", timeout=60_000)
+            # Attached is sufficient for scraping DOM text/attrs (#search-results is an ancestor).
+            page.wait_for_selector("article.full-docsum", state="attached", timeout=self.goto_timeout_ms)
         except PlaywrightTimeoutError:
             if debug_html_on_error:
                 try:
-                    Path(debug_html_on_error).write_text(page.content(), encoding="utf-8")
+                    _write_html(Path(debug_html_on_error), page.content())
                 except Exception:
                     pass
             raise
 
+        next_page: Optional[Future] = None
+        if include_next_page:
+            next_page_url = page.evaluate(NEXT_PAGE_URL_JS)
+            if next_page_url:
+                next_page = _PREFETCH_POOL.submit(
+                    _fetch_html, to_full_pubmed_url(next_page_url), user_agent=self.user_agent
+                )
+
         if save_html_path:
             html = page.content()
-            save_html_path.write_text(html, encoding="utf-8")
-
-        data = scrape_pubmed_results(page, max_results=max_results)
-        if out_json_path:
-            out_json_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-
-        if browser is not None:
-            browser.close()
+            _write_html(save_html_path, html)
+            # The HTML is already in memory: parse it locally rather than querying the page again.
+            if LexborHTMLParser is not None:
+                data = scrape_pubmed_from_html(html, max_results=max_results)
+            else:
+                data = scrape_pubmed_results(page, max_results=max_results)
         else:
-            context.close()
+            data = scrape_pubmed_results(page, max_results=max_results)
+        if next_page is not None:
+            try:
+                next_html = next_page.result()
+            # URLError/HTTPError/timeouts, or a broken response (IncompleteRead): page 1 is still valid.
+            except (OSError, http.client.HTTPException) as e:
+                print(f"Next results page not fetched ({e}); returning the first page only.", file=sys.stderr)
+            else:
+                data = _merge_result_pages([data, scrape_pubmed_from_html(next_html, max_results=max_results)])
+        if out_json_path:
+            out_json_path.write_bytes(_dumps_json(data))
         return data
 
 
+def run_pubmed_scrape(
+    *,
+    terms: list[str],
+    headless: bool = True,
+    slowmo: int = 0,
+    step_delay: Optional[int] = None,
+    max_results: int = 10,
+    save_html: Optional[str] = None,
+    output_json: Optional[str] = "pubmed_results.json",
+    source: str = "live",
+    local_home: Optional[str] = None,
+    pub_date_start: Optional[str] = None,
+    pub_date_end: Optional[str] = None,
+    debug_html_on_error: Optional[str] = "pubmed_debug_last.html",
+    user_data_dir: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    locale: str = "en-US",
+    timezone_id: str = "America/New_York",
+    chromium_channel: Optional[str] = None,
+    engine: str = "eutils",
+    ui_interaction: bool = False,
+    network_timeout_ms: int = DEFAULT_NETWORK_TIMEOUT_MS,
+    goto_timeout_ms: int = DEFAULT_GOTO_TIMEOUT_MS,
+    full_render: bool = False,
+    api_key: Optional[str] = None,
+    cache_path: Optional[str] = str(DEFAULT_CACHE_PATH),
+    cache_ttl_seconds: int = DEFAULT_CACHE_TTL_SECONDS,
+    force_refresh: bool = False,
+) -> dict[str, Any]:
+    """
+    Programmatic API for this scraper (used by the chat agent).
+    Returns the structured JSON dict. Optionally writes HTML/JSON to disk.
+    engine="eutils" (default) uses the E-utilities JSON API; engine="playwright" drives
+    Chromium. An HTML snapshot (save_html) always needs the browser.
+    The browser path runs in a persistent profile (user_data_dir, default
+    ~/.cache/pubmed_scraper_profile); use PubMedScraper directly to reuse one browser
+    across several searches.
+    Results are memoized in a SQLite cache at cache_path (None disables it) for
+    cache_ttl_seconds; force_refresh skips the lookup. An HTML snapshot can't be served
+    from the cache, so save_html always scrapes.
+    step_delay is deprecated and ignored (the browser flow waits on selectors instead).
+    """
+    if step_delay is not None:
+        warnings.warn(
+            "step_delay is deprecated and ignored; the browser flow waits on selectors instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+
+    structured_query = build_pubmed_structured_query(terms)
+
+    cache = ResultCache(cache_path) if cache_path and not save_html else None
+    # The browser result also depends on which home page it searched from.
+    cache_engine = engine if engine == "eutils" else f"{engine}:{source}"
+    cache_key = ResultCache.make_key(structured_query, pub_date_start, pub_date_end, max_results, cache_engine)
+    try:
+        data = cache.get(cache_key, cache_ttl_seconds) if cache is not None and not force_refresh else None
+        if data is None:
+            if engine == "eutils" and not save_html:
+                data = fetch_pubmed_eutils(
+                    terms,
+                    retmax=max_results,
+                    mindate=pub_date_start,
+                    maxdate=pub_date_end,
+                    api_key=api_key,
+                )
+            else:
+                with PubMedScraper(
+                    headless=headless,
+                    slowmo=slowmo,
+                    user_data_dir=user_data_dir,
+                    user_agent=user_agent,
+                    locale=locale,
+                    timezone_id=timezone_id,
+                    chromium_channel=chromium_channel,
+                    network_timeout_ms=network_timeout_ms,
+                    goto_timeout_ms=goto_timeout_ms,
+                    full_render=full_render,
+                ) as scraper:
+                    data = scraper.scrape(
+                        terms=terms,
+                        max_results=max_results,
+                        save_html=save_html,
+                        source=source,
+                        local_home=local_home,
+                        pub_date_start=pub_date_start,
+                        pub_date_end=pub_date_end,
+                        debug_html_on_error=debug_html_on_error,
+                        ui_interaction=ui_interaction,
+                    )
+            if cache is not None:
+                cache.put(cache_key, data)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if output_json:
+        Path(output_json).expanduser().write_bytes(_dumps_json(data))
+    return data
+
+
+async def _scrape_results_page_async(
+    browser,
+    url: str,
+    *,
+    max_results: Optional[int],
+    semaphore: asyncio.Semaphore,
+    locale: str,
+    timezone_id: str,
+    user_agent: Optional[str],
+    network_timeout_ms: int,
+    goto_timeout_ms: int,
+) -> dict[str, Any]:
+    async with semaphore:
+        context = await browser.new_context(
+            locale=locale, timezone_id=timezone_id, user_agent=user_agent, service_workers="block"
+        )
+        try:
+            await context.route("**/*", _block_heavy_resources_async)
+            page = await context.new_page()
+            page.set_default_timeout(network_timeout_ms)
+            await page.goto(url, wait_until="commit", timeout=goto_timeout_ms)
+            await page.wait_for_selector("article.full-docsum", state="attached", timeout=goto_timeout_ms)
+            raw = await page.evaluate(EXTRACT_RESULTS_JS, max_results)
+        finally:
+            await context.close()
+    return _build_results_payload(raw)
+
+
+async def run_pubmed_scrape_many(
+    queries: list[list[str]],
+    *,
+    concurrency: int = 4,
+    pages: int = 1,
+    max_results: Optional[int] = None,
+    pub_date_start: Optional[str] = None,
+    pub_date_end: Optional[str] = None,
+    headless: bool = True,
+    user_agent: Optional[str] = None,
+    locale: str = "en-US",
+    timezone_id: str = "America/New_York",
+    chromium_channel: Optional[str] = None,
+    network_timeout_ms: int = DEFAULT_NETWORK_TIMEOUT_MS,
+    goto_timeout_ms: int = DEFAULT_GOTO_TIMEOUT_MS,
+) -> list[dict[str, Any]]:
+    """
+    Scrape several queries (each a list of terms) concurrently in one browser, one context per
+    results page, at most `concurrency` pages in flight. With pages > 1 the first `pages`
+    results pages of every query are fetched in parallel and merged in page order.
+    max_results applies per results page. Returns one structured dict per query, in order.
+    """
+    structured_queries = [build_pubmed_structured_query(terms) for terms in queries]
+    pages = max(1, int(pages))
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=headless,
+            channel=chromium_channel,
+            args=["--disable-blink-features=AutomationControlled"],
+        )
+        try:
+            tasks = [
+                _scrape_results_page_async(
+                    browser,
+                    build_pubmed_results_url(q, pub_date_start, pub_date_end, page_number),
+                    max_results=max_results,
+                    semaphore=semaphore,
+                    locale=locale,
+                    timezone_id=timezone_id,
+                    user_agent=user_agent,
+                    network_timeout_ms=network_timeout_ms,
+                    goto_timeout_ms=goto_timeout_ms,
+                )
+                for q in structured_queries
+                for page_number in range(1, pages + 1)
+            ]
+            page_payloads = await asyncio.gather(*tasks)
+        finally:
+            await browser.close()
+
+    return [_merge_result_pages(page_payloads[i * pages : (i + 1) * pages]) for i in range(len(structured_queries))]
+
+
+def scrape_pubmed_many(queries: list[list[str]], **kwargs: Any) -> list[dict[str, Any]]:
+    """Blocking wrapper around run_pubmed_scrape_many for callers without an event loop."""
+    return asyncio.run(run_pubmed_scrape_many(queries, **kwargs))
+
+
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Scrape PubMed search results using Playwright.")
+    parser = argparse.ArgumentParser(description="Scrape PubMed search results (E-utilities API or Playwright).")
     parser.add_argument("--terms", nargs="*", help='Terms/phrases, e.g. --terms older alzheimer "factor analysis"')
     parser.add_argument("--query", help='Query string to split like a shell, e.g. --query \'older alzheimer "factor analysis"\'')
     parser.add_argument("positional", nargs="*", help=argparse.SUPPRESS)
@@ -471,12 +1079,17 @@ def main() -> int:
     parser.add_argument(
         "--step-delay",
         type=int,
-        default=600,
-        help="Extra pause between major steps (ms). Set 0 to disable. Auto-disabled in headless mode.",
+        default=None,
+        help="Deprecated and ignored: steps now wait on selectors instead of fixed pauses.",
     )
     parser.add_argument("--max-results", type=int, default=10, help="How many results to extract from the first page.")
 
-    parser.add_argument("--save-html", default="PubmedAfterSearch_generated.html", help="Path to save the resulting HTML.")
+    parser.add_argument(
+        "--save-html",
+        default=None,
+        metavar="PATH",
+        help="Also save the rendered results page here (implies the browser). Off by default.",
+    )
     parser.add_argument("--output", default="pubmed_results.json", help="Path to save structured results JSON.")
 
     parser.add_argument(
@@ -499,13 +1112,65 @@ def main() -> int:
     parser.add_argument(
         "--pub-date-start",
         default=None,
-        help="If set, uses Advanced Search and sets Publication Date start (YYYY/MM/DD), e.g. 2012/01/01",
+        help="Publication Date start (YYYY/MM/DD), e.g. 2012/01/01. Set via Advanced Search with --ui-interaction.",
     )
     parser.add_argument(
         "--pub-date-end",
         default=None,
-        help="If set, uses Advanced Search and sets Publication Date end (YYYY/MM/DD), e.g. 2012/12/31",
+        help="Publication Date end (YYYY/MM/DD), e.g. 2012/12/31. Set via Advanced Search with --ui-interaction.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["eutils", "playwright"],
+        default="eutils",
+        help=(
+            "'eutils' (default) queries the NCBI E-utilities JSON API, no browser; "
+            "'playwright' drives Chromium (also used whenever --save-html is set)."
+        ),
+    )
+    parser.add_argument(
+        "--ui-interaction",
+        action="store_true",
+        help=(
+            "Browser path: search by typing into the PubMed homepage (or Advanced Search for dates) "
+            "instead of opening the results URL directly. Useful to watch the flow headed."
+        ),
+    )
+    parser.add_argument(
+        "--full-render",
+        action="store_true",
+        help="Browser path: load images, CSS, fonts and trackers normally (for debugging layout/selectors).",
+    )
+    parser.add_argument(
+        "--network-timeout-ms",
+        type=int,
+        default=DEFAULT_NETWORK_TIMEOUT_MS,
+        help="Browser path: default timeout for selector waits and actions (ms).",
+    )
+    parser.add_argument(
+        "--goto-timeout-ms",
+        type=int,
+        default=DEFAULT_GOTO_TIMEOUT_MS,
+        help="Browser path: timeout for page navigations and the first results render (ms).",
+    )
+    parser.add_argument(
+        "--api-key",
+        default=None,
+        help="Optional NCBI API key for the E-utilities path (raises the rate limit from 3 to 10 req/s).",
+    )
+    parser.add_argument(
+        "--cache-path",
+        default=str(DEFAULT_CACHE_PATH),
+        help="SQLite file used to memoize results. Default: ~/.cache/pubmed_scraper_cache.sqlite3",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Don't read or write the results cache.")
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=DEFAULT_CACHE_TTL_SECONDS,
+        help="Seconds a cached result stays fresh (default: 24h).",
     )
+    parser.add_argument("--refresh", action="store_true", help="Ignore a cached result and scrape again.")
     args = parser.parse_args()
 
     try:
@@ -518,7 +1183,7 @@ def main() -> int:
         terms=terms,
         headless=bool(args.headless),
         slowmo=int(args.slowmo),
-        step_delay=int(args.step_delay),
+        step_delay=args.step_delay,
         max_results=int(args.max_results),
         save_html=str(args.save_html) if args.save_html else None,
         output_json=str(args.output) if args.output else None,
@@ -526,8 +1191,17 @@ def main() -> int:
         local_home=str(args.local_home) if args.local_home else None,
         pub_date_start=str(args.pub_date_start) if args.pub_date_start else None,
         pub_date_end=str(args.pub_date_end) if args.pub_date_end else None,
+        engine=str(args.engine),
+        ui_interaction=bool(args.ui_interaction),
+        network_timeout_ms=int(args.network_timeout_ms),
+        goto_timeout_ms=int(args.goto_timeout_ms),
+        full_render=bool(args.full_render),
+        api_key=str(args.api_key) if args.api_key else None,
+        cache_path=None if args.no_cache else str(args.cache_path),
+        cache_ttl_seconds=int(args.cache_ttl),
+        force_refresh=bool(args.refresh),
     )
-    print(json.dumps(data, indent=2, ensure_ascii=False))
+    print(_dumps_json(data).decode("utf-8"))
 
     return 0
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import json
 from typing import Any, Dict, List, Optional
 
@@ -7,6 +8,11 @@ import httpx
 from django.conf import settings
 from openai import OpenAI
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 from .pubmed_api import PubMedSearchParams, pubmed_search
 
 
@@ -18,14 +24,58 @@ When returning PubMed results, return ONLY valid JSON (no markdown, no backticks
 For other questions, answer normally.
 """
 
+# Built once at import and passed as-is on every request.
+_SYSTEM_MSG: Dict[str, Any] = {"role": "system", "content": SYSTEM_PROMPT}
+
+_TOOL_DEF = (
+    {
+        "type": "function",
+        "function": {
+            "name": "pubmed_search",
+            "description": "Fetch PubMed search results using NCBI E-utilities (free PubMed API) and return a JSON object.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "terms": {"type": "array", "items": {"type": "string"}},
+                    "max_results": {"type": "integer", "minimum": 1, "maximum": 200, "default": 10},
+                    "pub_date_start": {"type": ["string", "null"], "description": "YYYY or YYYY/MM/DD"},
+                    "pub_date_end": {"type": ["string", "null"], "description": "YYYY or YYYY/MM/DD"},
+                },
+                "required": ["terms"],
+                "additionalProperties": False,
+            },
+        },
+    },
+)
+
+# Tool-call arguments that map 1:1 onto PubMedSearchParams fields.
+_SEARCH_ARG_KEYS = frozenset({"terms", "max_results", "pub_date_start", "pub_date_end"})
+
+
+def _tool_args(raw: Optional[str]) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 
+def _tool_content(result: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(result).decode("utf-8")
+    return json.dumps(result, ensure_ascii=False)
+
+
+@functools.lru_cache(maxsize=1)
 def _get_client() -> OpenAI:
+    # Built once per process so every chat request reuses the same keep-alive pool.
+    # Call _get_client.cache_clear() after changing the OpenAI settings.
     if not getattr(settings, "OPENAI_API_KEY", ""):
         raise RuntimeError("Missing OPENAI_API_KEY in backend environment.")
-    kwargs = {"api_key": settings.OPENAI_API_KEY}
-    if getattr(settings, "DISABLE_SSL_VERIFY", False):
-        kwargs["http_client"] = httpx.Client(verify=False)
-    return OpenAI(**kwargs)
+    http_client = httpx.Client(
+        http2=True,
+        verify=not getattr(settings, "DISABLE_SSL_VERIFY", False),
+        limits=httpx.Limits(max_keepalive_connections=16),
+    )
+    return OpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
 
 
 def chat_with_tools(
@@ -40,69 +90,54 @@ def chat_with_tools(
     client = _get_client()
     model = model or getattr(settings, "OPENAI_MODEL", "gpt-4o-mini")
 
-    tool_def = [
-        {
-            "type": "function",
-            "function": {
-                "name": "pubmed_search",
-                "description": "Fetch PubMed search results using NCBI E-utilities (free PubMed API) and return a JSON object.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "terms": {"type": "array", "items": {"type": "string"}},
-                        "max_results": {"type": "integer", "minimum": 1, "maximum": 200, "default": 10},
-                        "pub_date_start": {"type": ["string", "null"], "description": "YYYY or YYYY/MM/DD"},
-                        "pub_date_end": {"type": ["string", "null"], "description": "YYYY or YYYY/MM/DD"},
-                    },
-                    "required": ["terms"],
-                    "additionalProperties": False,
-                },
-            },
-        }
-    ]
-
-    full_messages: List[Dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}] + list(messages)
+    full_messages: List[Dict[str, Any]] = [_SYSTEM_MSG, *messages]
 
     resp = client.chat.completions.create(
         model=model,
         messages=full_messages,
-        tools=tool_def,
+        tools=_TOOL_DEF,
         tool_choice="auto",
     )
     msg = resp.choices[0].message
 
     # Tool calling loop
     while getattr(msg, "tool_calls", None):
+        # Built from the known fields directly: no pydantic dump per tool call.
         full_messages.append(
             {
                 "role": "assistant",
-                "content": msg.content or "",
-                "tool_calls": [tc.model_dump() for tc in msg.tool_calls],
+                "content": msg.content,
+                "tool_calls": [
+                    {
+                        "id": tc.id,
+                        "type": "function",
+                        "function": {"name": tc.function.name, "arguments": tc.function.arguments},
+                    }
+                    for tc in msg.tool_calls
+                ],
             }
         )
         for tc in msg.tool_calls:
             if tc.function.name != "pubmed_search":
                 raise RuntimeError(f"Unknown tool: {tc.function.name}")
-            call_args = json.loads(tc.function.arguments or "{}")
+            call_args = _tool_args(tc.function.arguments)
+            # The schema already types these fields; just drop anything it doesn't declare.
             params = PubMedSearchParams(
-                terms=call_args.get("terms") or [],
-                max_results=int(call_args.get("max_results", 10)),
-                pub_date_start=call_args.get("pub_date_start"),
-                pub_date_end=call_args.get("pub_date_end"),
+                **{"terms": [], **{k: v for k, v in call_args.items() if k in _SEARCH_ARG_KEYS}}
             )
             result = pubmed_search(params)
             full_messages.append(
                 {
                     "role": "tool",
                     "tool_call_id": tc.id,
-                    "content": json.dumps(result, ensure_ascii=False),
+                    "content": _tool_content(result),
                 }
             )
 
         resp = client.chat.completions.create(
             model=model,
             messages=full_messages,
-            tools=tool_def,
+            tools=_TOOL_DEF,
             tool_choice="auto",
         )
         msg = resp.choices[0].message
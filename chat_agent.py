@@ -1,14 +1,34 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import json
 import os
+import random
 import re
 import sys
+import threading
+import time
 import traceback
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, TextIO, Tuple
 
-from openai import OpenAI
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    import readline
+except ImportError:  # not available on Windows; input() still works, just without recall
+    readline = None
 
 from pubmed_api import PubMedSearchParams, pubmed_search
 
@@ -21,7 +41,134 @@ When returning PubMed results, return ONLY valid JSON (no markdown, no backticks
 For other questions, answer normally.
 """
 
+_TOOLS: Tuple[Dict[str, Any], ...] = (
+    {
+        "type": "function",
+        "function": {
+            "name": "pubmed_search",
+            "description": "Fetch PubMed search results using NCBI E-utilities (free PubMed API) and return a JSON object.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "terms": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Search terms/phrases, e.g. ['older', 'alzheimer', 'factor analysis']",
+                    },
+                    "max_results": {"type": "integer", "minimum": 1, "maximum": 25, "default": 10},
+                    "pub_date_start": {
+                        "type": ["string", "null"],
+                        "description": "Optional publication start date in YYYY or YYYY/MM/DD.",
+                    },
+                    "pub_date_end": {
+                        "type": ["string", "null"],
+                        "description": "Optional publication end date in YYYY or YYYY/MM/DD.",
+                    },
+                },
+                "required": ["terms"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "pubmed_details",
+            "description": "Return full records (authors, citation, dates) from an earlier pubmed_search call.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "tool_call_id": {"type": "string", "description": "tool_call_id shown in the search digest."},
+                    "pmids": {
+                        "type": ["array", "null"],
+                        "items": {"type": "string"},
+                        "description": "Optional subset of PMIDs; omit for all records.",
+                    },
+                },
+                "required": ["tool_call_id"],
+                "additionalProperties": False,
+            },
+        },
+    },
+)
+
+_NORMALIZE_FULL_RE = re.compile(r"(\d{4})[-/](\d{2})[-/](\d{2})")
+# Prompts that may need a PubMed lookup; with --small-model, everything else goes to the cheap model.
+_TOOL_HINT_RE = re.compile(
+    r"\b(pubmed|papers?|articles?|stud(?:y|ies)|trials?|pmids?|abstracts?|citations?|journals?"
+    r"|search|results?|details?)\b",
+    re.IGNORECASE,
+)
+# Per SYSTEM_PROMPT, PubMed results are answered with the JSON itself; for these prompts a single
+# search result is printed directly instead of paying for a model round-trip that re-emits it.
+_JSON_INTENT = re.compile(r"\b(json|raw|pubmed)\b", re.IGNORECASE)
+
+# Full pubmed_search payloads by tool_call_id. Once the model has read a result, the history
+# keeps only a digest of it; pubmed_details serves the records from here (no NCBI round-trip).
+_TOOL_PAYLOADS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_TOOL_PAYLOADS_MAX = 64
+
+# Upper bounds on model-supplied tool input; anything bigger is rejected before parsing.
+_MAX_TOOL_ARGS_CHARS = 16384
+_MAX_TERMS = 64
+# A search result is re-sent with every later request until it is digested, so bound its size:
+# at most this many records, and long fields clipped (pubmed_details replies too; the unclipped
+# records stay in _TOOL_PAYLOADS).
+_MAX_TOOL_RESULTS = 25
+_CLIP_FIELDS = MappingProxyType({"title": 300, "authors": 200, "snippet": 800})
+
+_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "researchagent")
+_HISTORY_FILE = os.path.join(_CACHE_DIR, "history")
+_HISTORY_MAX = 1000
+
+_RETRY_ATTEMPTS = 5
+_RETRY_MAX_DELAY_S = 30.0
+# Everything the SDK's own retry loop covers (it is turned off for these calls):
+# 429, 5xx, connection errors/timeouts, and 408/409.
+_RETRYABLE = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError, openai.APITimeoutError)
+_RETRYABLE_STATUS = frozenset({408, 409})
+
+# Once the turns older than the last few (plus any earlier summary) pass this many characters,
+# they are folded into one summary message, so per-turn input stays bounded instead of growing
+# forever. The system prompt and the kept turns don't count: after a fold the foldable part is
+# just the short summary, so the next fold (which rewrites the cached prefix) is many turns away.
+_SUMMARY_TRIGGER_CHARS = 8000
+_SUMMARY_KEEP_TURNS = 4
+_SUMMARY_PROMPT = (
+    "Summarize the prior dialog in at most 200 tokens. "
+    "Preserve entities, search terms, dates, PMIDs and any decisions made."
+)
 
+
+def _tool_args(raw: Optional[str]) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _tool_content(result: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(result).decode("utf-8")
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _stable_system_prompt(tools: Sequence[Dict[str, Any]]) -> str:
+    """
+    SYSTEM_PROMPT plus a canonical (sorted-key) dump of the tool schema. The result is
+    byte-identical on every turn. On its own it is only ~400 tokens, below the 1024-token
+    minimum of OpenAI's automatic prompt caching; caching starts once system + tools +
+    history pass that (typically after the first search result), and a stable start is
+    what lets every later request reuse the prefill.
+    """
+    schema = json.dumps(tools, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return f"{SYSTEM_PROMPT}\nAvailable tools (JSON schema, for reference):\n{schema}\n"
+
+
+# Read-only so no caller can change the cached prompt prefix; each session copies it.
+_SYSTEM_MSG = MappingProxyType({"role": "system", "content": _stable_system_prompt(_TOOLS)})
+
+
+@functools.lru_cache(maxsize=256)
 def _normalize_pubmed_date(s: Optional[str], *, kind: str) -> Optional[str]:
     """
     Accepts YYYY, YYYY/MM/DD, YYYY-MM-DD and returns YYYY/MM/DD (or None).
@@ -32,28 +179,282 @@ def _normalize_pubmed_date(s: Optional[str], *, kind: str) -> Optional[str]:
     s = str(s).strip()
     if not s:
         return None
-    if re.fullmatch(r"\d{4}", s):
+    # Only YYYY (4 chars) and YYYY/MM/DD (10 chars) are rewritten; anything else skips the regex.
+    n = len(s)
+    if n == 4 and s.isdecimal():
         return f"{s}/01/01" if kind == "start" else f"{s}/12/31"
-    m = re.fullmatch(r"(\d{4})[-/](\d{2})[-/](\d{2})", s)
-    if m:
-        return f"{m.group(1)}/{m.group(2)}/{m.group(3)}"
+    if n == 10:
+        m = _NORMALIZE_FULL_RE.fullmatch(s)
+        if m:
+            return f"{m.group(1)}/{m.group(2)}/{m.group(3)}"
     return s
 
 
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    response = getattr(exc, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after", "")), _RETRY_MAX_DELAY_S)
+        except ValueError:
+            pass  # missing, or an HTTP date: fall back to backoff
+    return min(2**attempt + random.random(), _RETRY_MAX_DELAY_S)
+
+
+async def _create_with_retry(client: AsyncOpenAI, **kwargs: Any) -> Any:
+    """
+    chat.completions.create with jittered exponential backoff on rate limits, server errors,
+    408/409, connection errors and timeouts; a response with Retry-After waits exactly that
+    long. An exhausted quota is not transient and is raised at once.
+    """
+    client = client.with_options(max_retries=0)  # retried here instead; don't stack the SDK's own retries
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except openai.APIError as e:
+            retryable = isinstance(e, _RETRYABLE) or (
+                isinstance(e, openai.APIStatusError) and e.status_code in _RETRYABLE_STATUS
+            )
+            if not retryable or attempt == _RETRY_ATTEMPTS - 1 or getattr(e, "code", None) == "insufficient_quota":
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"\n[{type(e).__name__}; retrying in {delay:.1f}s]", file=sys.stderr)
+            await asyncio.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+async def _stream_chat(
+    client: AsyncOpenAI, *, out: TextIO = sys.stdout, **kwargs: Any
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Run one chat completion with stream=True. Text deltas are written to `out` as they
+    arrive (first token shows up immediately); tool-call fragments are stitched together
+    by index. Returns (content, tool_calls) with tool_calls in the API's message shape.
+    """
+    parts: List[str] = []
+    calls: Dict[int, Dict[str, Any]] = {}
+    # Only opening the stream is retried: once deltas have been printed, a failure propagates.
+    async for chunk in await _create_with_retry(client, stream=True, **kwargs):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            parts.append(delta.content)
+            out.write(delta.content)
+            out.flush()
+        for tc in delta.tool_calls or ():
+            call = calls.setdefault(tc.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function is not None:
+                call["function"]["name"] += tc.function.name or ""
+                call["function"]["arguments"] += tc.function.arguments or ""
+    return "".join(parts), [calls[i] for i in sorted(calls)]
+
+
+_BATCH_DONE = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+async def run_batch(
+    client: AsyncOpenAI,
+    path: str,
+    *,
+    model: str,
+    tools: Sequence[Dict[str, Any]],
+    poll_s: float = 30.0,
+) -> int:
+    """
+    Submit every non-empty line of `path` as an independent prompt through the Batch API
+    (about half the per-token price, no RPM limit) and print the replies in input order.
+    Tool calls are not executed in batch mode: use it for prompts that can be answered
+    directly; a reply that asks for a tool is reported as such.
+    """
+    with open(path, encoding="utf-8") as f:
+        prompts = [line.strip() for line in f if line.strip()]
+    if not prompts:
+        print(f"No prompts in {path}.", file=sys.stderr)
+        return 2
+
+    system_msg = {"role": "system", "content": _stable_system_prompt(tools)}
+    jsonl = "".join(
+        json.dumps(
+            {
+                "custom_id": f"req-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": [system_msg, {"role": "user", "content": prompt}],
+                    "tools": tools,
+                    "tool_choice": "auto",
+                },
+            },
+            ensure_ascii=False,
+        )
+        + "\n"
+        for i, prompt in enumerate(prompts)
+    )
+    upload = await client.files.create(file=("batch.jsonl", jsonl.encode("utf-8")), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=upload.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    print(f"Submitted batch {batch.id} ({len(prompts)} prompts); polling every {poll_s:g}s...", file=sys.stderr)
+    started = time.monotonic()
+    while batch.status not in _BATCH_DONE:
+        await asyncio.sleep(poll_s)
+        batch = await client.batches.retrieve(batch.id)
+    print(f"Batch {batch.status} after {time.monotonic() - started:.0f}s.", file=sys.stderr)
+
+    replies: Dict[str, str] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        raw = await client.files.content(file_id)
+        for line in raw.text.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            body = (row.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            if row.get("error") or not choices:
+                replies[row["custom_id"]] = f"[error] {row.get('error') or body.get('error')}"
+                continue
+            message = choices[0].get("message") or {}
+            if message.get("tool_calls"):
+                replies[row["custom_id"]] = "[needs a tool call; not executed in batch mode - rerun with --one-shot]"
+            else:
+                replies[row["custom_id"]] = message.get("content") or ""
+
+    for i, prompt in enumerate(prompts):
+        print(f"=== req-{i}: {prompt}")
+        print(replies.get(f"req-{i}", f"[no result: batch {batch.status}]"))
+    return 0 if batch.status == "completed" else 1
+
+
+async def _compact_history(client: AsyncOpenAI, messages: List[Dict[str, Any]], *, model: str, user: str) -> None:
+    """
+    Replace messages[1:cut] with a single "Prior context summary" system message when that
+    slice is too long. cut is the start of the K-th most recent user turn, so an assistant
+    tool_calls message is never separated from its tool responses. The system prompt at
+    messages[0] is kept verbatim.
+    """
+    turn_starts = [i for i, m in enumerate(messages) if m["role"] == "user"]
+    if len(turn_starts) <= _SUMMARY_KEEP_TURNS:
+        return
+    cut = turn_starts[-_SUMMARY_KEEP_TURNS]
+    if sum(len(m.get("content") or "") for m in messages[1:cut]) <= _SUMMARY_TRIGGER_CHARS:
+        return
+    resp = await _create_with_retry(
+        client,
+        model=model,
+        messages=[{"role": "system", "content": _SUMMARY_PROMPT}, *messages[1:cut]],
+        user=user,
+    )
+    summary = resp.choices[0].message.content or ""
+    messages[1:cut] = [{"role": "system", "content": f"Prior context summary: {summary}"}]
+
+
+def _clip_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    records = []
+    for r in result.get("results") or []:
+        r = dict(r)
+        for field, limit in _CLIP_FIELDS.items():
+            v = r.get(field)
+            if isinstance(v, str) and len(v) > limit:
+                r[field] = v[:limit] + "..."
+        records.append(r)
+    return {**result, "results": records}
+
+
+def _session_path(name: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    return os.path.join(_CACHE_DIR, f"session-{safe}.json")
+
+
+def _load_session(path: str) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """
+    Return (user id, messages) saved by _save_session, or (None, []) if there is none. The
+    saved search payloads go back into _TOOL_PAYLOADS so pubmed_details works on resumed digests.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except FileNotFoundError:
+        return None, []
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable session file {path}: {e}", file=sys.stderr)
+        return None, []
+    messages = data.get("messages") if isinstance(data, dict) else None
+    if not isinstance(messages, list) or not messages:
+        return None, []
+    payloads = data.get("payloads")
+    if isinstance(payloads, dict):
+        _TOOL_PAYLOADS.update(payloads)
+    return data.get("user"), messages
+
+
+def _save_session(path: str, user: str, messages: List[Dict[str, Any]]) -> None:
+    """
+    Write messages up to the end of the last completed turn: a turn that failed part-way can
+    leave a user message without a reply, or an assistant tool_calls message without all of
+    its tool replies, and the API rejects the latter on every later request.
+    """
+    complete = [
+        i
+        for i, m in enumerate(messages)
+        if m["role"] == "system" or (m["role"] == "assistant" and not m.get("tool_calls"))
+    ]
+    kept = messages[: complete[-1] + 1]
+    referenced = {m.get("tool_call_id") for m in kept if m["role"] == "tool"}
+    payloads = {k: v for k, v in _TOOL_PAYLOADS.items() if k in referenced}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"user": user, "messages": kept, "payloads": payloads}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _digest_result(tool_call_id: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "tool_call_id": tool_call_id,
+        "total_results": result.get("total_results"),
+        "results": [{"pmid": r.get("pmid"), "title": r.get("title")} for r in result.get("results") or []],
+        "note": "Digest only. Call pubmed_details with this tool_call_id for the full records.",
+    }
+
+
+def tool_pubmed_details(args: Dict[str, Any]) -> Dict[str, Any]:
+    tool_call_id = args.get("tool_call_id") or ""
+    payload = _TOOL_PAYLOADS.get(tool_call_id)
+    if payload is None:
+        return {"error": "unknown_tool_call_id", "message": f"No stored pubmed_search result for {tool_call_id!r}."}
+    records = payload.get("results") or []
+    pmids = args.get("pmids")
+    if pmids:
+        wanted = {str(p) for p in pmids}
+        records = [r for r in records if r.get("pmid") in wanted]
+    return {"tool_call_id": tool_call_id, "results": records}
+
+
 def tool_pubmed_search(args: Dict[str, Any]) -> Dict[str, Any]:
     terms = args.get("terms") or []
-    if not isinstance(terms, list) or not all(isinstance(t, str) for t in terms):
-        raise ValueError("`terms` must be a list of strings")
+    if not isinstance(terms, list) or len(terms) > _MAX_TERMS or not all(isinstance(t, str) for t in terms):
+        raise ValueError(f"`terms` must be a list of at most {_MAX_TERMS} strings")
 
     max_results = args.get("max_results", 10)
-    pub_date_start = _normalize_pubmed_date(args.get("pub_date_start"), kind="start")
-    pub_date_end = _normalize_pubmed_date(args.get("pub_date_end"), kind="end")
+    # The schema isn't strict: the model may send e.g. 2020 as a number. Coerce before the
+    # memoized normalizer, whose lru_cache can't hash arbitrary JSON values.
+    start, end = args.get("pub_date_start"), args.get("pub_date_end")
+    pub_date_start = _normalize_pubmed_date(None if start is None else str(start), kind="start")
+    pub_date_end = _normalize_pubmed_date(None if end is None else str(end), kind="end")
 
     try:
+        max_results = max(1, min(int(max_results), _MAX_TOOL_RESULTS))
+        # pubmed_search keeps its own 10-minute cache (and returns a private copy), so repeated
+        # calls with the same arguments don't reach NCBI again.
         return pubmed_search(
             PubMedSearchParams(
                 terms=terms,
-                max_results=int(max_results),
+                max_results=max_results,
                 pub_date_start=pub_date_start,
                 pub_date_end=pub_date_end,
                 retstart=0,
@@ -67,6 +468,25 @@ def tool_pubmed_search(args: Dict[str, Any]) -> Dict[str, Any]:
         }
 
 
+_TOOL_FUNCS = MappingProxyType({"pubmed_search": tool_pubmed_search, "pubmed_details": tool_pubmed_details})
+
+
+def _call_tool(name: str, raw_args: str) -> Dict[str, Any]:
+    """
+    Run one tool call. A rejected or failing call returns an error payload for its tool
+    message (every tool_call_id needs a reply) instead of raising out of the turn.
+    """
+    func = _TOOL_FUNCS.get(name)
+    if func is None:
+        return {"error": "unknown_tool", "message": f"Unknown tool: {name}"}
+    if len(raw_args) > _MAX_TOOL_ARGS_CHARS:
+        return {"error": "arguments_too_large", "message": f"Tool arguments too large ({len(raw_args)} chars)"}
+    try:
+        return func(_tool_args(raw_args))
+    except Exception as e:
+        return {"error": "tool_failed", "message": f"{type(e).__name__}: {e}"}
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="ChatGPT-powered agent with a PubMed scraping tool.")
     parser.add_argument("--model", default=os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
@@ -75,110 +495,232 @@ def main() -> int:
         help="If set, sends one user message and exits (prints assistant response).",
         default=None,
     )
+    parser.add_argument(
+        "--batch-file",
+        default=None,
+        help=(
+            "Text file with one prompt per line: submit them all via the OpenAI Batch API "
+            "(~50%% cheaper, completes within 24h), wait, and print the replies. Tools are not run."
+        ),
+    )
+    parser.add_argument(
+        "--session",
+        default=None,
+        metavar="NAME",
+        help=(
+            "Resume the named conversation from ~/.cache/researchagent/session-NAME.json and save it "
+            "back on exit. Resuming soon after the last run reuses OpenAI's cached prompt prefix."
+        ),
+    )
+    parser.add_argument(
+        "--summary-model",
+        default="gpt-4o-mini",
+        help="Cheap model used to summarize older turns once the history gets long.",
+    )
+    parser.add_argument(
+        "--small-model",
+        default=os.getenv("OPENAI_SMALL_MODEL") or None,
+        help=(
+            "Cheaper model for turns that don't mention papers/PubMed/search; those turns run "
+            "without tool calls. Default: $OPENAI_SMALL_MODEL, or off (always --model)."
+        ),
+    )
     args = parser.parse_args()
 
     if not os.getenv("OPENAI_API_KEY"):
         print("Missing OPENAI_API_KEY in environment.", file=sys.stderr)
         return 2
 
-    client = OpenAI()
-
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "pubmed_search",
-                "description": "Fetch PubMed search results using NCBI E-utilities (free PubMed API) and return a JSON object.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "terms": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "Search terms/phrases, e.g. ['older', 'alzheimer', 'factor analysis']",
-                        },
-                        "max_results": {"type": "integer", "minimum": 1, "maximum": 200, "default": 10},
-                        "pub_date_start": {
-                            "type": ["string", "null"],
-                            "description": "Optional publication start date in YYYY or YYYY/MM/DD.",
-                        },
-                        "pub_date_end": {
-                            "type": ["string", "null"],
-                            "description": "Optional publication end date in YYYY or YYYY/MM/DD.",
-                        },
-                    },
-                    "required": ["terms"],
-                    "additionalProperties": False,
-                },
-            },
-        }
-    ]
+    # One pooled HTTP/2 connection for the whole session: the TLS handshake is paid once and
+    # streamed replies, summaries and batch polls share it.
+    client = AsyncOpenAI(
+        http_client=httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=60),
+        )
+    )
 
-    messages: List[Dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}]
+    # Prompt caching keys on an exact prefix match: messages is append-only (never edit,
+    # reorder or drop messages[:-1]) except when _compact_history folds old turns into a
+    # summary and when a consumed search result is swapped for its digest (right after the
+    # follow-up request, so every later request sees the same bytes). `user` keeps the
+    # requests routed to the same cache.
+    messages: List[Dict[str, Any]] = [dict(_SYSTEM_MSG)]
+    session_id = uuid.uuid4().hex
+    session_path = _session_path(args.session) if args.session else None
+    if session_path:
+        saved_user, saved = _load_session(session_path)
+        if saved:
+            # Search results were already swapped for their digests before saving (the full
+            # payloads are saved beside them for pubmed_details). A changed system prompt
+            # replaces the saved one (the cached prefix is lost either way then).
+            messages = [dict(_SYSTEM_MSG)] + saved[1:]
+            print(f"Resumed session {args.session!r} ({len(saved) - 1} messages).", file=sys.stderr)
+        session_id = saved_user or session_id
+    last_user: Optional[str] = None
+    last_reply: Optional[str] = None
 
-    def run_turn(user_text: str) -> str:
-        nonlocal messages
+    async def run_turn(user_text: str) -> str:
+        """Run one user turn; the reply is streamed to stdout and also returned."""
+        nonlocal messages, last_user, last_reply
+        # Same message as the previous turn: replay that reply instead of paying for it again.
+        if user_text == last_user and last_reply is not None:
+            print(last_reply, end="", flush=True)
+            return last_reply
         messages.append({"role": "user", "content": user_text})
+        needs_tools = not args.small_model or bool(_TOOL_HINT_RE.search(user_text))
 
-        resp = client.chat.completions.create(
-            model=args.model,
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
-        msg = resp.choices[0].message
+        async def complete(*, follow_up: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+            # After tool results the model only has to answer, so tool_choice="none" there.
+            # The schema itself stays in every request: dropping it would change the prompt
+            # prefix and lose the cached (discounted) input tokens for the whole history.
+            return await _stream_chat(
+                client,
+                model=args.model if needs_tools else args.small_model,
+                messages=messages,
+                tools=_TOOLS,
+                tool_choice="auto" if needs_tools and not follow_up else "none",
+                user=session_id,
+            )
+
+        content, tool_calls = await complete()
 
         # Tool calling loop (support multiple calls)
-        while getattr(msg, "tool_calls", None):
-            messages.append(
-                {
-                    "role": "assistant",
-                    "content": msg.content or "",
-                    "tool_calls": [tc.model_dump() for tc in msg.tool_calls],
-                }
+        while tool_calls:
+            messages.append({"role": "assistant", "content": content, "tool_calls": tool_calls})
+            # The calls are independent: run them side by side (gather keeps call order).
+            results = await asyncio.gather(
+                *(
+                    asyncio.to_thread(_call_tool, tc["function"]["name"], tc["function"]["arguments"])
+                    for tc in tool_calls
+                )
             )
-            for tc in msg.tool_calls:
-                if tc.function.name != "pubmed_search":
-                    raise RuntimeError(f"Unknown tool: {tc.function.name}")
-                call_args = json.loads(tc.function.arguments or "{}")
-                result = tool_pubmed_search(call_args)
+            # (tool message, digest) for every record list in this round, search or details alike.
+            fresh: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+            for tc, result in zip(tool_calls, results):
+                has_records = "results" in result
                 messages.append(
                     {
                         "role": "tool",
-                        "tool_call_id": tc.id,
-                        "content": json.dumps(result, ensure_ascii=False),
+                        "tool_call_id": tc["id"],
+                        "content": _tool_content(_clip_result(result) if has_records else result),
                     }
                 )
+                if not has_records:
+                    continue
+                if tc["function"]["name"] == "pubmed_search":
+                    _TOOL_PAYLOADS[tc["id"]] = result
+                    while len(_TOOL_PAYLOADS) > _TOOL_PAYLOADS_MAX:
+                        _TOOL_PAYLOADS.popitem(last=False)
+                    fresh.append((messages[-1], _digest_result(tc["id"], result)))
+                else:
+                    # pubmed_details: the digest points back at the search the records came from.
+                    fresh.append((messages[-1], _digest_result(result["tool_call_id"], result)))
 
-            resp = client.chat.completions.create(
-                model=args.model,
-                messages=messages,
-                tools=tools,
-                tool_choice="auto",
-            )
-            msg = resp.choices[0].message
+            if (
+                len(tool_calls) == 1
+                and len(fresh) == 1
+                and tool_calls[0]["function"]["name"] == "pubmed_search"
+                and _JSON_INTENT.search(user_text)
+            ):
+                result = results[0]
+                content = _tool_content(result)
+                print(content, end="", flush=True)
+                # Nobody read the full result, so it goes straight to its digest; the short
+                # assistant note keeps the history a valid tool-call/answer sequence.
+                fresh[0][0]["content"] = _tool_content(fresh[0][1])
+                messages.append(
+                    {
+                        "role": "assistant",
+                        "content": _tool_content({"summary": f"returned {len(result['results'])} records"}),
+                    }
+                )
+                await _compact_history(client, messages, model=args.summary_model, user=session_id)
+                last_user, last_reply = user_text, content
+                return content
 
-        messages.append({"role": "assistant", "content": msg.content or ""})
-        return msg.content or ""
+            content, tool_calls = await complete(follow_up=True)
+            # The model has read the records; later requests only carry the digests.
+            for m, digest in fresh:
+                m["content"] = _tool_content(digest)
 
-    if args.one_shot is not None:
-        print(run_turn(args.one_shot))
-        return 0
+        messages.append({"role": "assistant", "content": content})
+        await _compact_history(client, messages, model=args.summary_model, user=session_id)
+        last_user, last_reply = user_text, content
+        return content
 
-    print("Chat agent ready. Type your message and press Enter. Type 'exit' to quit.")
-    while True:
+    def read_lines(loop: asyncio.AbstractEventLoop, queue: "asyncio.Queue[Optional[str]]") -> None:
+        # Reads stdin on its own thread so the next message can be typed while a reply streams;
+        # None marks end of input.
+        while True:
+            try:
+                line: Optional[str] = input()
+            except (EOFError, KeyboardInterrupt, OSError):
+                line = None
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, line)
+            except RuntimeError:  # event loop already closed
+                return
+            if line is None:
+                return
+
+    async def repl() -> None:
+        if readline is not None:
+            try:
+                readline.read_history_file(_HISTORY_FILE)
+            except OSError:
+                pass  # first run
+            readline.set_history_length(_HISTORY_MAX)
+        print("Chat agent ready. Type your message and press Enter. Type 'exit' to quit.")
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        threading.Thread(target=read_lines, args=(asyncio.get_running_loop(), queue), daemon=True).start()
         try:
-            user_text = input("> ").strip()
-        except (EOFError, KeyboardInterrupt):
-            print()
-            break
-        if not user_text:
-            continue
-        if user_text.lower() in {"exit", "quit"}:
-            break
-        out = run_turn(user_text)
-        print(out)
+            while True:
+                if queue.empty():
+                    print("> ", end="", flush=True)
+                line = await queue.get()
+                if line is None:
+                    print()
+                    break
+                user_text = line.strip()
+                if not user_text:
+                    continue
+                if user_text.lower() in {"exit", "quit"}:
+                    break
+                await run_turn(user_text)
+                print()
+        finally:
+            if readline is not None:
+                try:
+                    os.makedirs(os.path.dirname(_HISTORY_FILE), exist_ok=True)
+                    readline.write_history_file(_HISTORY_FILE)
+                except OSError:
+                    pass
 
+    def run(coro: Any) -> Any:
+        async def runner() -> Any:
+            try:
+                return await coro
+            finally:
+                await client.close()  # close pooled sockets while the loop is still alive
+                if session_path:
+                    _save_session(session_path, session_id, messages)
+
+        return asyncio.run(runner())
+
+    if args.batch_file:
+        return run(run_batch(client, args.batch_file, model=args.model, tools=_TOOLS))
+
+    if args.one_shot is not None:
+        run(run_turn(args.one_shot))
+        print()
+        return 0
+
+    try:
+        run(repl())
+    except KeyboardInterrupt:
+        print()
     return 0
 
 
@@ -1,20 +1,83 @@
 from __future__ import annotations
 
-import json
+import copy
+import functools
 import re
+import threading
+import time
 import urllib.parse
-import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import orjson
+except ImportError:  # optional speedup; httpx's stdlib json decoding is the fallback
+    orjson = None
 
 
 YEAR_RE = re.compile(r"\b(18|19|20)\d{2}\b")
+_WS_RE = re.compile(r"\s+")
+_NORMALIZE_FULL_RE = re.compile(r"(\d{4})[-/](\d{2})[-/](\d{2})")
+
+
+# One pooled client for all E-utilities calls: keep-alive + HTTP/2 amortize the TLS handshake
+# across esearch/esummary and across searches.
+_HTTP = httpx.Client(
+    http2=True,
+    timeout=30.0,
+    headers={
+        "User-Agent": "ResearchAgent-Scrapp/1.0 (E-utilities; contact: local)",
+        "Accept": "application/json",
+    },
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+)
+
+
+class _RateLimiter:
+    """Spaces request starts at least 1/per_second apart across all threads."""
+
+    def __init__(self, per_second: float) -> None:
+        self._interval = 1.0 / per_second
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+# NCBI's E-utilities limits: 3 requests/second per IP, 10 with an API key.
+_NCBI_RATE = _RateLimiter(3.0)
+_NCBI_RATE_KEYED = _RateLimiter(10.0)
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="eutils")
+
+# Finished pubmed_search results keyed on the normalized query: (stored_at, result).
+_SEARCH_CACHE: "OrderedDict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+_SEARCH_CACHE_MAX = 512
+_SEARCH_CACHE_TTL_S = 600.0
+
+# UIDs per esummary request; larger max_results fan out over _POOL (still paced by the rate limiter).
+_ESUMMARY_CHUNK = 200
 
 
 def _clean_text(s: str) -> str:
-    return re.sub(r"\s+", " ", (s or "").strip())
+    return _WS_RE.sub(" ", (s or "").strip())
 
 
+# ESummary JSON fields carry no embedded runs of whitespace; trimming the ends is enough.
+_clean_simple = str.strip
+
+
+@functools.lru_cache(maxsize=512)
 def _normalize_pubmed_date(s: Optional[str], *, kind: str) -> Optional[str]:
     """
     Accepts YYYY, YYYY/MM/DD, YYYY-MM-DD and returns YYYY/MM/DD (or None).
@@ -25,16 +88,24 @@ def _normalize_pubmed_date(s: Optional[str], *, kind: str) -> Optional[str]:
     s = str(s).strip()
     if not s:
         return None
-    if re.fullmatch(r"\d{4}", s):
+    # Only YYYY (4 chars) and YYYY/MM/DD (10 chars) are rewritten; anything else skips the regex.
+    n = len(s)
+    if n == 4 and s.isdecimal():
         return f"{s}/01/01" if kind == "start" else f"{s}/12/31"
-    m = re.fullmatch(r"(\d{4})[-/](\d{2})[-/](\d{2})", s)
-    if m:
-        return f"{m.group(1)}/{m.group(2)}/{m.group(3)}"
+    if n == 10:
+        m = _NORMALIZE_FULL_RE.fullmatch(s)
+        if m:
+            return f"{m.group(1)}/{m.group(2)}/{m.group(3)}"
     return s
 
 
 def build_query_from_terms(terms: List[str]) -> str:
-    cleaned = [_clean_text(t) for t in (terms or []) if _clean_text(t)]
+    return _build_query_cached(tuple(terms or ()))
+
+
+@functools.lru_cache(maxsize=512)
+def _build_query_cached(terms: Tuple[str, ...]) -> str:
+    cleaned = [c for c in (_clean_text(t) for t in terms) if c]
     if not cleaned:
         raise ValueError("No terms provided")
     # Keep it simple and predictable: AND the quoted phrases.
@@ -44,18 +115,35 @@ def build_query_from_terms(terms: List[str]) -> str:
     return " AND ".join(f"\"{t}\"" for t in cleaned)
 
 
-def _http_get_json(url: str, *, timeout_s: int = 30) -> Dict[str, Any]:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "ResearchAgent-Scrapp/1.0 (E-utilities; contact: local)",
-            "Accept": "application/json",
-        },
-        method="GET",
-    )
-    with urllib.request.urlopen(req, timeout=timeout_s) as resp:
-        raw = resp.read().decode("utf-8", errors="replace")
-    return json.loads(raw)
+def _http_get_json(url: str, *, timeout_s: int = 30, keyed: bool = False) -> Dict[str, Any]:
+    (_NCBI_RATE_KEYED if keyed else _NCBI_RATE).wait()
+    resp = _HTTP.get(url, timeout=timeout_s)
+    resp.raise_for_status()
+    # orjson parses the raw UTF-8 bytes directly (no decode-to-str step).
+    return orjson.loads(resp.content) if orjson is not None else resp.json()
+
+
+def _search_cache_get(key: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    with _SEARCH_CACHE_LOCK:
+        hit = _SEARCH_CACHE.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= _SEARCH_CACHE_TTL_S:
+            del _SEARCH_CACHE[key]
+            return None
+        _SEARCH_CACHE.move_to_end(key)
+        result = hit[1]
+    # Callers own (and may mutate) what they get back; the cached copy must stay intact.
+    return copy.deepcopy(result)
+
+
+def _search_cache_put(key: Tuple[Any, ...], result: Dict[str, Any]) -> None:
+    result = copy.deepcopy(result)
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), result)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > _SEARCH_CACHE_MAX:
+            _SEARCH_CACHE.popitem(last=False)
 
 
 def _parse_publication_year(pubdate: str) -> Optional[int]:
@@ -70,30 +158,19 @@ def _parse_publication_year(pubdate: str) -> Optional[int]:
 
 def _format_journal_citation(doc: Dict[str, Any]) -> str:
     # esummary fields vary; build a best-effort citation string.
-    source = _clean_text(str(doc.get("source", "")))
-    pubdate = _clean_text(str(doc.get("pubdate", "")))
-    volume = _clean_text(str(doc.get("volume", "")))
-    issue = _clean_text(str(doc.get("issue", "")))
-    pages = _clean_text(str(doc.get("pages", "")))
-    elocation = _clean_text(str(doc.get("elocationid", "")))
-
-    parts: List[str] = []
-    if source:
-        parts.append(f"{source}.")
-    if pubdate:
-        parts.append(f"{pubdate};")
-    vol_issue = ""
-    if volume:
-        vol_issue += volume
-    if issue:
-        vol_issue += f"({issue})" if volume else issue
-    if vol_issue:
-        parts.append(vol_issue + ":")
-    if pages:
-        parts.append(pages + ".")
-    elif elocation:
-        parts.append(elocation + ".")
-    return _clean_text(" ".join(parts)).strip(";")
+    get = doc.get
+    source, pubdate, volume, issue, pages, elocation = (
+        _clean_simple(str(get(k, ""))) for k in ("source", "pubdate", "volume", "issue", "pages", "elocationid")
+    )
+    vol_issue = f"{volume}({issue})" if volume and issue else volume or issue
+    pieces = (
+        f"{source}." if source else "",
+        f"{pubdate};" if pubdate else "",
+        f"{vol_issue}:" if vol_issue else "",
+        f"{pages or elocation}." if pages or elocation else "",
+    )
+    # Whitespace is normalized once on the joined string rather than per field.
+    return _clean_text(" ".join(p for p in pieces if p)).strip(";")
 
 
 @dataclass
@@ -104,12 +181,27 @@ class PubMedSearchParams:
     pub_date_end: Optional[str] = None
     retstart: int = 0
     sort: str = "relevance"
+    api_key: Optional[str] = None
 
 
 def pubmed_search(params: PubMedSearchParams) -> Dict[str, Any]:
     query = build_query_from_terms(params.terms)
-    mindate = _normalize_pubmed_date(params.pub_date_start, kind="start")
-    maxdate = _normalize_pubmed_date(params.pub_date_end, kind="end")
+    # Params may come straight from model tool arguments; str() keeps the memoized call hashable.
+    start, end = params.pub_date_start, params.pub_date_end
+    mindate = _normalize_pubmed_date(None if start is None else str(start), kind="start")
+    maxdate = _normalize_pubmed_date(None if end is None else str(end), kind="end")
+
+    cache_key = (
+        tuple(c for c in (_clean_text(t).lower() for t in params.terms) if c),
+        int(params.max_results),
+        mindate,
+        maxdate,
+        params.sort,
+        int(params.retstart),
+    )
+    cached = _search_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     esearch_qs = {
         "db": "pubmed",
@@ -126,8 +218,13 @@ def pubmed_search(params: PubMedSearchParams) -> Dict[str, Any]:
         if maxdate:
             esearch_qs["maxdate"] = maxdate
 
-    esearch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?" + urllib.parse.urlencode(esearch_qs)
-    esearch = _http_get_json(esearch_url, timeout_s=30)
+    # The key only raises NCBI's rate limit (3 -> 10 req/s); keep it out of the returned URLs.
+    key_qs = {"api_key": params.api_key} if params.api_key else {}
+    esearch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?" + urllib.parse.urlencode(
+        {**esearch_qs, **key_qs}
+    )
+    keyed = bool(key_qs)
+    esearch = _http_get_json(esearch_url, timeout_s=30, keyed=keyed)
     es = esearch.get("esearchresult") or {}
 
     count = int(es.get("count") or 0)
@@ -142,24 +239,40 @@ def pubmed_search(params: PubMedSearchParams) -> Dict[str, Any]:
     if params.retstart + retmax < count:
         next_retstart = params.retstart + retmax
 
+    # Provide a next_page_url-like string for compatibility (points to next esearch call)
+    next_page_url = ""
+    if next_retstart is not None:
+        esearch_qs_next = dict(esearch_qs)
+        esearch_qs_next["retstart"] = str(next_retstart)
+        next_page_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?" + urllib.parse.urlencode(
+            esearch_qs_next
+        )
+
     results: List[Dict[str, Any]] = []
     if uids:
-        esummary_qs = {
-            "db": "pubmed",
-            "id": ",".join(uids),
-            "retmode": "json",
-        }
-        esummary_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?" + urllib.parse.urlencode(esummary_qs)
-        esummary = _http_get_json(esummary_url, timeout_s=30)
-        summ = esummary.get("result") or {}
+        esummary_urls = [
+            "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?"
+            + urllib.parse.urlencode({"db": "pubmed", "id": ",".join(chunk), "retmode": "json", **key_qs})
+            for chunk in (uids[i : i + _ESUMMARY_CHUNK] for i in range(0, len(uids), _ESUMMARY_CHUNK))
+        ]
+        # One chunk: fetch inline. More: issue them concurrently and merge; order comes from uids.
+        if len(esummary_urls) == 1:
+            summaries = [_http_get_json(esummary_urls[0], timeout_s=30, keyed=keyed)]
+        else:
+            summaries = list(_POOL.map(functools.partial(_http_get_json, keyed=keyed), esummary_urls))
+        summ: Dict[str, Any] = {}
+        for esummary in summaries:
+            summ.update(esummary.get("result") or {})
 
         # Keep result order stable as uids
         for pmid in uids:
             doc = summ.get(pmid) or {}
             title = _clean_text(str(doc.get("title", "")))
-            pubdate = _clean_text(str(doc.get("pubdate", "")))
+            pubdate = _clean_simple(str(doc.get("pubdate", "")))
             authors = doc.get("authors") or []
-            author_str = ", ".join(_clean_text(str(a.get("name", ""))) for a in authors if isinstance(a, dict) and a.get("name"))
+            author_str = ", ".join(
+                _clean_simple(str(a.get("name", ""))) for a in authors if isinstance(a, dict) and a.get("name")
+            )
 
             journal_citation = _format_journal_citation(doc)
             results.append(
@@ -177,16 +290,7 @@ def pubmed_search(params: PubMedSearchParams) -> Dict[str, Any]:
                 }
             )
 
-    # Provide a next_page_url-like string for compatibility (points to next esearch call)
-    next_page_url = ""
-    if next_retstart is not None:
-        esearch_qs_next = dict(esearch_qs)
-        esearch_qs_next["retstart"] = str(next_retstart)
-        next_page_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?" + urllib.parse.urlencode(
-            esearch_qs_next
-        )
-
-    return {
+    data = {
         "source": "eutils",
         "query": query,
         "total_results": count,
@@ -195,4 +299,6 @@ def pubmed_search(params: PubMedSearchParams) -> Dict[str, Any]:
         "chunk_ids": uids,
         "results": results,
     }
+    _search_cache_put(cache_key, data)
+    return data
 